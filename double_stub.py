@@ -5,8 +5,8 @@ Created on Mon Oct 14 10:22:44 2019
 @author: efren
 """
 
+import math
 import numpy as np
-import scipy.optimize as sco
 import sys as sys
 
 """ A continuacion tomamos los datos necsarios 
@@ -41,8 +41,22 @@ YL=1/ZL
 def desplazamiento(YL_f,l_f):
     """ Función para desplazar admitancia una distancia l_f lambdas
     """
-    num=(YL_f/Y0)*np.cos(2*np.pi*l_f)+1j*np.sin(2*np.pi*l_f)
-    den=np.cos(2*np.pi*l_f)+1j*np.sin(2*np.pi*l_f)*(YL_f/Y0)
+    e_f=np.exp(2j*np.pi*l_f)     #cos y sin en una sola exponencial
+    num=(YL_f/Y0)*e_f.real+1j*e_f.imag
+    den=e_f.real+1j*e_f.imag*(YL_f/Y0)
+    YLd=Y0*num/den
+    return YLd
+
+""" La distancia entre stubs no cambia: calculamos su coseno y seno una vez
+"""
+cd=np.cos(2*np.pi*d)
+sd=np.sin(2*np.pi*d)
+
+def desplazamiento_d(YL_f):
+    """ Igual que desplazamiento(YL_f,d) pero con cd y sd ya calculados
+    """
+    num=(YL_f/Y0)*cd+1j*sd
+    den=cd+1j*sd*(YL_f/Y0)
     YLd=Y0*num/den
     return YLd
 
@@ -51,103 +65,75 @@ if shortopen==1:
     def stub(l_f):
         """ Calcula la Y_s que aplica el stub a la lina (corto)
         """
-        return -1j*Y0s*cot(2*np.pi*l_f)
+        return complex(0.,-Y0s*cot(2*math.pi*l_f))
+    
+    def longitud(b_f):
+        """ Longitud del stub (corto) que aplica la susceptancia b_f
+        """
+        return (np.arctan2(Y0s,-b_f)/(2*np.pi))%0.5
     
 elif shortopen==2:
     
     def stub(l_f):
         """ Calcula la Y_s que aplica el stub a la lina (abierto)
         """
-        return 1j*Y0s*np.tan(2*np.pi*l_f)
+        return complex(0.,Y0s*math.tan(2*math.pi*l_f))
+    
+    def longitud(b_f):
+        """ Longitud del stub (abierto) que aplica la susceptancia b_f
+        """
+        return (np.arctan2(b_f,Y0s)/(2*np.pi))%0.5
     
 else:
     sys.exit('Please, define the stubs correctly')
 
 def cot(x):
-    """ Cotangente (no definida en numpy)
+    """ Cotangente (no definida en math), x nunca es k*pi para
+    longitudes de stub en (0,0.5) lambdas
     """
-    return np.cos(x)/np.sin(x)
+    return 1./math.tan(x)
 
-def funcion(l_f):
-    """ Función a minimizar para obtener parte real 
-    de admitancia=1, de esta forma obtenemos l1
+def elimina_repetidas(sol_f,tol_f):
+    """ Ordena las soluciones y elimina las que distan menos de tol_f
     """
-    YLs=stub(l_f)
-    YLb=YLa+YLs
-    YLc=desplazamiento(YLb,d)
-    f=YLc.real/Y0-1.
-    return f
-
-def func(l_f):
-    """ Función a minimizar para obtener
-    l2 una vez conocido l1
+    a=np.sort(np.asarray(sol_f))
+    keep=np.concatenate(([True],np.diff(a)>tol_f))
+    return a[keep].tolist()
+
+def _run_legacy_cli():
+    """ Calcula las longitudes de los stubs y las muestra en pantalla
+    """
+    #======================== Calculo del primer stub ===============================
+    """ Exigir parte real de admitancia=1 tras desplazar d lambdas da una
+    ecuacion de segundo grado en la susceptancia normalizada B en el stub1:
+        s^2*B^2 - 2*c*s*B + c^2 + s^2*g^2 - g = 0
+    con c=cd=cos(2*pi*d), s=sd=sin(2*pi*d) y g la conductancia normalizada, de modo
+    que l1 se obtiene de forma cerrada sin necesidad de fsolve
     """
-    YLs=stub(l1)
-    YLb=YLa+YLs
-    YLc=desplazamiento(YLb,d)
-    f=YLc.imag+stub(l_f).imag
-    return f
-
-z=[0.]
-long=[]
-for i in range(1,500): #bucle para inicializar la solución a valores distintos
-    lini=0.001*i                #Inicializamos la l1
     YLa=desplazamiento(YL,l)    #Aplicamos el desplazamiento hasta el stub1
-    sol=sco.fsolve(funcion,lini,xtol=precision) #Resolvemos la función
-    if 0<sol[0]<0.5 and np.abs(sol[0]-z[-1])>precision:
-        z.append(sol[0])    #Guardamos la solución
-
-""" A continuación nos deshacemos de las soluciones repetidas
-"""        
-z.pop(0)
-index=[]
-for j in range(1,len(z)):
-    if np.abs(z[0]-z[j])<precision:
-        index.append(j)
-index.sort(reverse=True)
-for i in index:
-    z.pop(i)
-index=[]
-for j in range(2,len(z)):
-    if np.abs(z[1]-z[j])<precision:
-        index.append(j)
-index.sort(reverse=True)
-for i in index:
-    z.pop(i)
-
-#======================== Calculo del segundo stub ==============================
-""" Mismo procedimiento que para el primero
-pero minimizando la función: 'func'
-"""
-w=[0.]
-for l1 in z:
-     for i in range(1,500):
-        lini=0.001*i
-        YLa=desplazamiento(YL,l)
-        sol=sco.fsolve(func,lini,xtol=1e-8)
-        if 0<sol[0]<0.5 :
-            w.append(sol[0])
-w.pop(0)
-w.pop(0)
-w.pop(-1)
-index=[]
-for j in range(1,len(w)):
-    if np.abs(w[0]-w[j])<precision:
-        index.append(j)
-index.sort(reverse=True)
-for i in index:
-    w.pop(i)
-index=[]
-for j in range(2,len(w)):
-    if np.abs(w[1]-w[j])<precision:
-        index.append(j)
-index.sort(reverse=True)
-for i in index:
-    w.pop(i)
-    
-""" Mostramos los resultados en pantalla
-"""
-print('The length for the stubs are (in lambdas):')
-print('Case 1: l1 = ',z[0],', l2 = ',w[0])
-print('Case 2: l1 = ',z[1],', l2 = ',w[1])
-print('The precision for this is: ', precision)
+    g=YLa.real/Y0
+    disc=g*(1.-g*sd**2)
+    if np.abs(sd)<precision or disc<0:
+        sys.exit('The load cannot be matched with this distance within stubs')
+    B=(cd+np.array([1.,-1.])*np.sqrt(disc))/sd
+    z=longitud(Y0*B-YLa.imag)   #Susceptancia que aporta el stub1
+    z=elimina_repetidas(z,precision)  #Raiz doble si disc=0
+
+    #======================== Calculo del segundo stub ==============================
+    """ Conocido l1, el segundo stub solo tiene que anular la parte
+    imaginaria de la admitancia en su posicion
+    """
+    w=[]
+    for l1 in z:
+        YLc=desplazamiento_d(YLa+stub(l1))
+        w.append(longitud(-YLc.imag))
+
+    """ Mostramos los resultados en pantalla
+    """
+    print('The length for the stubs are (in lambdas):')
+    for i in range(len(z)):
+        print('Case '+str(i+1)+': l1 = ',z[i],', l2 = ',w[i])
+    print('The precision for this is: ', precision)
+
+if __name__ == '__main__':
+    _run_legacy_cli()